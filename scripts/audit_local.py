@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Find slow constructs in ~/.zshrc.local and rewrite them to cached or lazy
+equivalents.
+
+install.sh migrates the user's previous ~/.zshrc into ~/.zshrc.local, which
+usually keeps the slowest parts of the old setup: `eval "$(pyenv init -)"`,
+conda init blocks, `$(brew --prefix)` subshells, a second compinit, a second
+NVM load and PATH prepends inside loops. This script estimates what each of
+them costs at startup and offers rewrites that rely on helpers ~/.zshrc
+already provides (`_zshrc_cached_eval`, `$HOMEBREW_PREFIX`).
+
+Usage:
+    python3 scripts/audit_local.py [FILE]            # report (default ~/.zshrc.local)
+    python3 scripts/audit_local.py --diff [FILE]     # report + dry-run diff
+    python3 scripts/audit_local.py --write [FILE]    # apply rewrites
+
+--write keeps a copy of the original as FILE.pre-audit-backup (first run only).
+"""
+import argparse
+import difflib
+import os
+import re
+import shutil
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# Init commands whose output only changes when the tool itself is upgraded,
+# so it can be cached by _zshrc_cached_eval. Value: (estimated ms, required
+# subcommand). Anything not listed here (ssh-agent, fnm env, ...) produces
+# per-shell output and is never cached.
+CACHEABLE_INIT = {
+    "pyenv": (120, None),
+    "rbenv": (60, None),
+    "nodenv": (60, None),
+    "goenv": (60, None),
+    "jenv": (150, None),
+    "direnv": (15, "hook"),
+    "zoxide": (10, "init"),
+    "starship": (20, "init"),
+    "thefuck": (250, None),
+    "brew": (40, "shellenv"),
+    "kubectl": (80, "completion"),
+    "helm": (60, "completion"),
+    "gh": (30, "completion"),
+    "register-python-argcomplete": (100, None),
+}
+# `pyenv virtualenv-init -` starts a second Python-heavy process
+PYENV_VIRTUALENV_COST_MS = 200
+
+CONDA_COST_MS = 300
+COMPINIT_COST_MS = 150
+NVM_COST_MS = {"nvm.sh": 400, "bash_completion": 10, "etc/bash_completion.d/nvm": 10}
+# Function each nvm file defines; a load is skipped once it exists
+NVM_DEFINES = {"nvm.sh": "nvm", "bash_completion": "__nvm", "etc/bash_completion.d/nvm": "__nvm"}
+BREW_PREFIX_COST_MS = 20
+BREW_PREFIX_FORMULA_COST_MS = 400
+PATH_LOOP_COST_MS = 2
+
+CONDA_BEGIN = "# >>> conda initialize >>>"
+CONDA_END = "# <<< conda initialize <<<"
+CONDA_LAZY_RE = re.compile(r'^\s*conda\s*\(\)\s*\{', re.MULTILINE)
+
+EVAL_RE = re.compile(r'eval\s+"?\$\((?P<cmd>[^()]*)\)"?')
+SOURCE_SUBST_RE = re.compile(r'(?:source|\.)\s+<\((?P<cmd>[^()]*)\)')
+STDERR_NULL_RE = re.compile(r'\s*2>\s*/dev/null\s*$')
+HOMEBREW_PREFIX_FALLBACK = "${HOMEBREW_PREFIX:-"
+BREW_PREFIX_RE = re.compile(r'\$\(\s*brew\s+--prefix(?:\s+(?P<formula>[\w@.+-]+))?\s*\)')
+COMPINIT_RE = re.compile(r'(?:^|[;&|]\s*|\s)compinit(?:\s|;|$)')
+# `autoload compinit` only marks the function for loading; it costs nothing
+AUTOLOAD_COMPINIT_RE = re.compile(r'autoload\s+(?:-\w+\s+)*compinit\b')
+COMPINIT_ONLY_RE = re.compile(
+    r'^\s*(?:autoload\s+(?:-\w+\s+)*compinit\s*(?:&&|;)\s*)?compinit(?:\s+-\w+)*\s*$'
+)
+FPATH_RE = re.compile(r'^\s*(?:export\s+)?(?:fpath|FPATH)\+?=')
+NVM_SOURCE_RE = re.compile(
+    r'(?:source|\.)\s+["\']?(?:\$NVM_DIR|\$\{NVM_DIR\}|~/\.nvm|\$HOME/\.nvm|\$\{HOME\}/\.nvm'
+    r'|\$\(\s*brew\s+--prefix\s+nvm\s*\)|[^\s"\';]*/opt/nvm)'
+    r'/(?P<file>nvm\.sh|bash_completion|etc/bash_completion\.d/nvm)'
+)
+NVM_GUARD_RE = re.compile(r'^\s*if\s+\(\(\s*!\s*\$\+functions\[_*nvm\]\s*\)\);\s*then\s*$')
+PATH_PREPEND_RE = re.compile(r'(?:^|[;\s])(?:export\s+)?(?:PATH="?[^=]*\$\{?PATH\b|path=\([^)]*\$path)')
+SHELL_META_RE = re.compile(r'[|;&<>`$]')
+LOOP_OPEN_RE = re.compile(r'(?:^|[;&|\s])do(?=\s|;|$)')
+LOOP_CLOSE_RE = re.compile(r'(?:^|[;&|\s])done(?=\s|;|$)')
+
+
+@dataclass
+class LogicalLine:
+    """One shell command line; backslash continuations are joined."""
+    start: int  # 1-based, inclusive
+    end: int
+    text: str
+    in_loop: bool = False
+
+
+@dataclass
+class Finding:
+    """A slow construct and, when one is safe, its rewrite.
+
+    Substring rewrites set `old`/`new` and replace `old` at character
+    `offset` of lines start..end (joined with newlines); block rewrites
+    leave `old` as None and replace the whole range with `new`. `new` is
+    None for report-only findings.
+    """
+    rule: str
+    start: int
+    end: int
+    cost_ms: int
+    message: str
+    old: Optional[str] = None
+    new: Optional[str] = None
+    offset: int = 0
+
+    @property
+    def fixable(self) -> bool:
+        return self.new is not None
+
+
+@dataclass
+class Report:
+    path: str
+    findings: List[Finding] = field(default_factory=list)
+
+    @property
+    def total_ms(self) -> int:
+        return sum(f.cost_ms for f in self.findings)
+
+    @property
+    def recoverable_ms(self) -> int:
+        return sum(f.cost_ms for f in self.findings if f.fixable)
+
+
+def _code_part(line: str) -> str:
+    """Strip quoted strings and trailing comments so keywords can be matched."""
+    out = []
+    quote = None
+    prev = ""
+    for ch in line:
+        if quote:
+            if ch == quote and prev != "\\":
+                quote = None
+            prev = ch
+            continue
+        if ch in "'\"":
+            quote = ch
+        elif ch == "#" and (not prev or prev.isspace()):
+            break
+        else:
+            out.append(ch)
+        prev = ch
+    return "".join(out)
+
+
+def parse(text: str) -> List[LogicalLine]:
+    """Split a zsh file into logical lines and mark the ones inside loops."""
+    physical = text.split("\n")
+    result = []
+    depth = 0
+    i = 0
+    while i < len(physical):
+        start = i
+        parts = [physical[i]]
+        while parts[-1].endswith("\\") and i + 1 < len(physical):
+            i += 1
+            parts.append(physical[i])
+        joined = "\n".join(parts)
+        code = _code_part(joined.replace("\\\n", " "))
+        opens = len(LOOP_OPEN_RE.findall(code))
+        closes = len(LOOP_CLOSE_RE.findall(code))
+        result.append(LogicalLine(start + 1, i + 1, joined, in_loop=depth > 0 or opens > 0))
+        depth = max(0, depth + opens - closes)
+        i += 1
+    return result
+
+
+def _cacheable(cmd: str) -> Optional[int]:
+    """Return the estimated cost if `cmd` is an init command safe to cache."""
+    words = cmd.split()
+    if not words:
+        return None
+    tool = os.path.basename(words[0])
+    if tool not in CACHEABLE_INIT:
+        return None
+    cost, subcommand = CACHEABLE_INIT[tool]
+    if subcommand and (len(words) < 2 or words[1] != subcommand):
+        return None
+    if tool == "pyenv" and "virtualenv-init" in words:
+        return PYENV_VIRTUALENV_COST_MS
+    return cost
+
+
+def _neutralize(line: LogicalLine, reason: str) -> str:
+    """Turn a line into a no-op that keeps the original as a comment.
+
+    `:` rather than a bare comment so an enclosing if/then body never
+    ends up empty.
+    """
+    indent = line.text[:len(line.text) - len(line.text.lstrip())]
+    original = " ".join(part.rstrip("\\").strip() for part in line.text.split("\n"))
+    return f"{indent}: # {reason}: {original}"
+
+
+def _brew_prefix_rewrite(match: "re.Match[str]") -> Tuple[str, int]:
+    """Return the $HOMEBREW_PREFIX replacement for a brew --prefix match and its cost.
+
+    A match that is already the fallback of a rewrite is returned unchanged.
+    """
+    if match.string[:match.start()].endswith(HOMEBREW_PREFIX_FALLBACK):
+        return match.group(0), 0
+    new = HOMEBREW_PREFIX_FALLBACK + "$(brew --prefix)}"
+    formula = match.group("formula")
+    if formula:
+        return new + f"/opt/{formula}", BREW_PREFIX_FORMULA_COST_MS
+    return new, BREW_PREFIX_COST_MS
+
+
+def _guard_nvm(line: LogicalLine, function: str) -> str:
+    """Wrap an nvm load so it only runs when ~/.zshrc has not loaded nvm.
+
+    ~/.zshrc loads $NVM_DIR/nvm.sh in the full profile only, and a Homebrew
+    nvm lives outside $NVM_DIR, so the load cannot simply be dropped.
+    """
+    indent = line.text[:len(line.text) - len(line.text.lstrip())]
+    body = BREW_PREFIX_RE.sub(lambda m: _brew_prefix_rewrite(m)[0], line.text)
+    return "\n".join([
+        f"{indent}if (( ! $+functions[{function}] )); then",
+        *("  " + part for part in body.split("\n")),
+        f"{indent}fi",
+    ])
+
+
+def _conda_finding(block: List[LogicalLine]) -> Optional[Finding]:
+    start, end = block[0].start, block[-1].end
+    body = "\n".join(line.text for line in block)
+    if CONDA_LAZY_RE.search(body):
+        return None  # already rewritten
+    exe = re.search(r"""['"]([^'"]*/bin/conda)['"]""", body)
+    message = "conda init block evaluates `conda shell.zsh hook` on every start"
+    if not exe:
+        return Finding("conda-init", start, end, CONDA_COST_MS, message)
+    prefix = exe.group(1)[:-len("/bin/conda")]
+    # The markers stay so a later `conda init` replaces this block in place
+    # instead of appending a second one. Only condabin (the conda command
+    # alone) goes on PATH, as the hook does; base's bin is left to the hook,
+    # which adds it only when auto_activate_base is set.
+    new = "\n".join([
+        block[0].text,
+        "# conda: hook is loaded on first use instead of at startup. With",
+        "# auto_activate_base, base (CONDA_PREFIX, its python on PATH) is only",
+        "# activated by the first conda command.",
+        f"export PATH=\"{prefix}/condabin:$PATH\"",
+        "conda() {",
+        "  unfunction conda",
+        f"  eval \"$('{exe.group(1)}' 'shell.zsh' 'hook' 2>/dev/null)\"",
+        "  conda \"$@\"",
+        "}",
+        block[-1].text,
+    ])
+    return Finding("conda-init", start, end, CONDA_COST_MS,
+                   message + "; load it lazily (base is only activated by the "
+                   "first conda command)", new=new)
+
+
+def _line_findings(line: LogicalLine, fpath_seen: bool, nvm_guarded: bool = False) -> List[Finding]:
+    code = _code_part(line.text)
+    if not code.strip():
+        return []
+    findings = []
+
+    nvm = NVM_SOURCE_RE.search(line.text)
+    if nvm and not nvm_guarded:
+        file = nvm.group("file")
+        return [Finding(
+            "nvm-reload", line.start, line.end, NVM_COST_MS[file],
+            f"{file} is loaded even when ~/.zshrc already loaded nvm (full profile); "
+            "only load it when nvm is not defined yet",
+            new=_guard_nvm(line, NVM_DEFINES[file]),
+        )]
+
+    if COMPINIT_RE.search(AUTOLOAD_COMPINIT_RE.sub("", code)):
+        message = ("compinit already runs in Oh My Zsh in the full profile "
+                   "(lean and minimal shells do without completion)")
+        if fpath_seen:
+            return [Finding("compinit", line.start, line.end, COMPINIT_COST_MS,
+                            message + "; this file extends fpath first, so this call is "
+                            "what picks those completions up (keep it or drop the fpath lines)")]
+        if COMPINIT_ONLY_RE.match(code):
+            return [Finding("compinit", line.start, line.end, COMPINIT_COST_MS, message,
+                            new=_neutralize(line, "already run by Oh My Zsh in the full profile"))]
+        return [Finding("compinit", line.start, line.end, COMPINIT_COST_MS, message)]
+
+    for regex in (EVAL_RE, SOURCE_SUBST_RE):
+        for match in regex.finditer(line.text):
+            cmd = STDERR_NULL_RE.sub("", match.group("cmd").strip())
+            cost = _cacheable(cmd)
+            if cost is None:
+                continue
+            message = f"`{cmd}` runs on every start"
+            if SHELL_META_RE.search(cmd):
+                findings.append(Finding("cached-eval", line.start, line.end, cost, message))
+            else:
+                findings.append(Finding("cached-eval", line.start, line.end, cost,
+                                        message + "; cache its output",
+                                        old=match.group(0), new=f"_zshrc_cached_eval {cmd}",
+                                        offset=match.start()))
+
+    for match in BREW_PREFIX_RE.finditer(line.text):
+        new, cost = _brew_prefix_rewrite(match)
+        # Already rewritten: the fallback keeps the original subshell
+        if new == match.group(0):
+            continue
+        findings.append(Finding("brew-prefix", line.start, line.end, cost,
+                                f"`{match.group(0)}` spawns brew; use $HOMEBREW_PREFIX",
+                                old=match.group(0), new=new, offset=match.start()))
+
+    if line.in_loop and PATH_PREPEND_RE.search(line.text):
+        findings.append(Finding(
+            "path-loop", line.start, line.end, PATH_LOOP_COST_MS,
+            "PATH prepended inside a loop grows with duplicates and slows every "
+            "command lookup; build the list once with `path=(dir ... $path)`",
+        ))
+    return findings
+
+
+def analyze(text: str, path: str = "~/.zshrc.local") -> Report:
+    """Return every slow construct found in `text`."""
+    report = Report(path)
+    lines = parse(text)
+    fpath_seen = False
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.text.strip() == CONDA_BEGIN:
+            j = i
+            while j < len(lines) and lines[j].text.strip() != CONDA_END:
+                j += 1
+            if j < len(lines):
+                finding = _conda_finding(lines[i:j + 1])
+                if finding:
+                    report.findings.append(finding)
+                i = j + 1
+                continue
+        nvm_guarded = i > 0 and bool(NVM_GUARD_RE.match(lines[i - 1].text))
+        report.findings.extend(_line_findings(line, fpath_seen, nvm_guarded))
+        if FPATH_RE.match(_code_part(line.text)):
+            fpath_seen = True
+        i += 1
+    return report
+
+
+def rewrite(text: str, report: Report) -> str:
+    """Apply every fixable finding in `report` to `text`."""
+    lines = text.split("\n")
+    # Bottom-up, and right to left within a line, so earlier line numbers
+    # and offsets stay valid after each replacement
+    for finding in sorted(report.findings, key=lambda f: (f.start, f.offset), reverse=True):
+        if not finding.fixable:
+            continue
+        span = slice(finding.start - 1, finding.end)
+        if finding.old is None:
+            lines[span] = finding.new.split("\n")
+            continue
+        chunk = "\n".join(lines[span])
+        end = finding.offset + len(finding.old)
+        if chunk[finding.offset:end] != finding.old:
+            continue
+        lines[span] = (chunk[:finding.offset] + finding.new + chunk[end:]).split("\n")
+    return "\n".join(lines)
+
+
+def format_report(report: Report) -> str:
+    if not report.findings:
+        return f"{report.path}: no slow constructs found"
+    out = [
+        f"{report.path}: {len(report.findings)} slow construct(s), "
+        f"~{report.total_ms}ms estimated startup cost "
+        f"(~{report.recoverable_ms}ms fixable automatically)",
+        "",
+        f"  {'line':>5}  {'cost':>7}  {'rule':<12} suggestion",
+    ]
+    for f in report.findings:
+        mark = "" if f.fixable else " [manual]"
+        out.append(f"  {f.start:>5}  {f.cost_ms:>5}ms  {f.rule:<12} {f.message}{mark}")
+    return "\n".join(out)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Report and rewrite slow constructs in ~/.zshrc.local.")
+    parser.add_argument("file", nargs="?", default=os.path.expanduser("~/.zshrc.local"),
+                        help="file to analyze (default: ~/.zshrc.local)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--diff", action="store_true",
+                      help="also print the rewrites as a unified diff (dry run)")
+    mode.add_argument("--write", action="store_true",
+                      help="apply the rewrites (original kept as FILE.pre-audit-backup)")
+    args = parser.parse_args(argv)
+
+    path = Path(args.file)
+    if not path.is_file():
+        print(f"{path}: not found", file=sys.stderr)
+        return 1
+    text = path.read_text()
+    report = analyze(text, str(path))
+    print(format_report(report))
+    if not any(f.fixable for f in report.findings):
+        return 0
+
+    new_text = rewrite(text, report)
+    if args.diff:
+        print()
+        sys.stdout.writelines(difflib.unified_diff(
+            text.splitlines(keepends=True), new_text.splitlines(keepends=True),
+            fromfile=str(path), tofile=f"{path} (rewritten)"))
+        print(f"\nApply with: python3 {sys.argv[0]} --write {path}")
+    elif args.write:
+        backup = path.with_name(path.name + ".pre-audit-backup")
+        if not backup.exists():
+            shutil.copy2(path, backup)
+        path.write_text(new_text)
+        print(f"\nRewrote {path} (original: {backup})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
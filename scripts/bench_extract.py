@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark px (zshrc) against the Oh My Zsh 'extract' plugin.
+
+Generates tar.gz / tar.bz2 / tar.xz / tar.zst archives of a compressible
+payload, extracts each one with both commands and prints the best wall time
+of several runs. A final row extracts every archive at once (px -j N vs the
+plugin's sequential `extract a b c`).
+
+Usage:
+    python3 scripts/bench_extract.py [--size-mb 256] [--repeat 3] [--omz ~/.oh-my-zsh]
+
+Needs zsh. The plugin column is skipped when Oh My Zsh is not installed.
+zshrc is sourced with ZSHRC_PROFILE=lean and a throwaway HOME, so your
+~/.zshrc.local and caches are not touched.
+"""
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+ZSHRC = REPO_DIR / "zshrc"
+CHUNK = 1 << 20
+WORDS = [b"alpha", b"beta", b"gamma", b"delta", b"build", b"artifact",
+         b"dataset", b"0123456789", b"\n", b" ", b"{", b"}"]
+
+
+def make_payload(root: Path, size_mb: int, files: int = 16, seed: int = 0) -> Path:
+    """Write `size_mb` MB of text-like, compressible data split across files.
+
+    A pool of random 1 MB blocks is shuffled into the files, which keeps
+    generation fast for multi-gigabyte payloads.
+    """
+    rng = random.Random(seed)
+    blocks = [b"".join(rng.choice(WORDS) for _ in range(CHUNK // 6))[:CHUNK]
+              for _ in range(min(32, max(1, size_mb)))]
+    payload = root / "payload"
+    payload.mkdir(parents=True, exist_ok=True)
+    per_file = max(1, size_mb * CHUNK // files)
+    for i in range(files):
+        with open(payload / f"part{i:03d}.txt", "wb") as fh:
+            written = 0
+            while written < per_file:
+                block = rng.choice(blocks)[:per_file - written]
+                fh.write(block)
+                written += len(block)
+    return payload
+
+
+def make_archives(root: Path, size_mb: int) -> List[Path]:
+    """Create one archive per format from the same payload.
+
+    Each archive gets its own stem (bench-gz.tar.gz, ...) so the all-at-once
+    case extracts into separate directories.
+    """
+    payload = make_payload(root, size_mb)
+    archives = []
+    for fmt, mode in [("gz", "w:gz"), ("bz2", "w:bz2"), ("xz", "w:xz")]:
+        path = root / f"bench-{fmt}.tar.{fmt}"
+        with tarfile.open(path, mode) as tar:
+            tar.add(payload, arcname="payload")
+        archives.append(path)
+    if shutil.which("zstd"):
+        plain = root / "bench-zst.tar"
+        zst = root / "bench-zst.tar.zst"
+        with tarfile.open(plain, "w") as tar:
+            tar.add(payload, arcname="payload")
+        subprocess.run(["zstd", "-q", "-T0", "--rm", "-o", str(zst), str(plain)], check=True)
+        archives.append(zst)
+    shutil.rmtree(payload)
+    return archives
+
+
+def plugin_command(omz: Path, archives: List[Path]) -> Optional[List[str]]:
+    plugin = omz / "plugins" / "extract" / "extract.plugin.zsh"
+    if not plugin.is_file():
+        return None
+    script = f'source {str(plugin)!r} && extract "$@"'
+    return ["zsh", "-fc", script, "zsh", *map(str, archives)]
+
+
+def px_command(archives: List[Path], jobs: int) -> List[str]:
+    # `;`, not `&&`: zshrc ends with `[ -f ~/.zshrc.local ] && ...`, which
+    # returns 1 under the throwaway HOME
+    script = f'source {str(ZSHRC)!r}; px -j {jobs} "$@"'
+    return ["zsh", "-c", script, "zsh", *map(str, archives)]
+
+
+def bench_env(home: Path) -> Dict[str, str]:
+    """Environment the commands run in: throwaway HOME, lean zshrc profile."""
+    return dict(os.environ, HOME=str(home), ZSHRC_PROFILE="lean")
+
+
+def best_time(cmd: List[str], repeat: int, home: Path) -> float:
+    """Best wall time of `repeat` runs, each in a fresh output directory."""
+    env = bench_env(home)
+    best = float("inf")
+    for _ in range(repeat):
+        out = Path(tempfile.mkdtemp(dir=home))
+        start = time.perf_counter()
+        result = subprocess.run(cmd, cwd=out, env=env, capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        shutil.rmtree(out)
+        if result.returncode != 0:
+            raise RuntimeError(f"{' '.join(cmd[:3])} failed:\n{result.stderr}")
+        best = min(best, elapsed)
+    return best
+
+
+def run(size_mb: int, repeat: int, omz: Path, jobs: int) -> List[Dict[str, object]]:
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="bench-extract-") as tmp:
+        root = Path(tmp)
+        home = root / "home"
+        home.mkdir()
+        print(f"Generating {size_mb} MB payload archives in {root} ...", file=sys.stderr)
+        archives = make_archives(root, size_mb)
+        cases = [(a.name, [a], 1) for a in archives]
+        cases.append((f"all {len(archives)} at once", archives, jobs))
+        for label, batch, n in cases:
+            plugin = plugin_command(omz, batch)
+            rows.append({
+                "archive": label,
+                "mb": sum(a.stat().st_size for a in batch) / CHUNK,
+                "plugin": best_time(plugin, repeat, home) if plugin else None,
+                "px": best_time(px_command(batch, n), repeat, home),
+            })
+    return rows
+
+
+def format_rows(rows: List[Dict[str, object]]) -> str:
+    out = [f"{'archive':<20} {'size':>9} {'extract':>9} {'px':>9} {'speedup':>8}"]
+    for row in rows:
+        plugin = row["plugin"]
+        out.append(
+            f"{row['archive']:<20} {row['mb']:>7.1f}MB "
+            + (f"{plugin:>8.2f}s" if plugin is not None else f"{'n/a':>9}")
+            + f" {row['px']:>8.2f}s "
+            + (f"{plugin / row['px']:>7.2f}x" if plugin is not None else f"{'':>8}")
+        )
+    return "\n".join(out)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark px against the extract plugin.")
+    parser.add_argument("--size-mb", type=int, default=256,
+                        help="uncompressed payload size per archive (default: 256)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case (default: 3)")
+    parser.add_argument("--jobs", type=int, default=4,
+                        help="px -j for the all-at-once case (default: 4)")
+    parser.add_argument("--omz", type=Path,
+                        default=Path(os.environ.get("ZSH", Path.home() / ".oh-my-zsh")),
+                        help="Oh My Zsh directory (default: $ZSH or ~/.oh-my-zsh)")
+    args = parser.parse_args(argv)
+
+    if not shutil.which("zsh"):
+        print("zsh is required to run this benchmark", file=sys.stderr)
+        return 1
+    print(format_rows(run(args.size_mb, args.repeat, args.omz.expanduser(), args.jobs)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
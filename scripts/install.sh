@@ -657,9 +657,23 @@ HEADER
       -e 's/^([[:space:]]*)(source|\.) +([^<].*)$/\1[ -f \3 ] \&\& \2 \3/' \
       "$source_file"
   } > "$dest"
+  audit_user_config "$dest"
   return 0
 }
 
+# Report slow constructs carried over into .zshrc.local (pyenv/conda init,
+# $(brew --prefix), duplicate compinit / NVM loads) with a dry-run diff of the
+# cached/lazy rewrites. Nothing is changed; the report says how to apply it.
+audit_user_config() {
+  local file="$1"
+
+  if ! command -v python3 >/dev/null 2>&1 || [ ! -f "${SCRIPT_DIR}/audit_local.py" ]; then
+    return 0
+  fi
+  log "Checking ~/.zshrc.local for slow startup constructs..."
+  python3 "${SCRIPT_DIR}/audit_local.py" --diff "$file" || warn "Could not analyze $file"
+}
+
 configure_zshrc() {
   local target="${HOME}/.zshrc"
   local local_override="${HOME}/.zshrc.local"
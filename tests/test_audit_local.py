@@ -0,0 +1,232 @@
+"""
+Tests for scripts/audit_local.py (slow-construct analyzer for ~/.zshrc.local).
+"""
+import importlib.util
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+AUDIT_SCRIPT = Path(__file__).parent.parent / "scripts" / "audit_local.py"
+
+_spec = importlib.util.spec_from_file_location("audit_local", AUDIT_SCRIPT)
+audit_local = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(audit_local)
+
+CONDA_BLOCK = """\
+# >>> conda initialize >>>
+# !! Contents within this block are managed by 'conda init' !!
+__conda_setup="$('/opt/miniconda3/bin/conda' 'shell.zsh' 'hook' 2> /dev/null)"
+if [ $? -eq 0 ]; then
+    eval "$__conda_setup"
+else
+    export PATH="/opt/miniconda3/bin:$PATH"
+fi
+unset __conda_setup
+# <<< conda initialize <<<
+"""
+
+
+def rules(text):
+    """Return the rule names found in text, in order."""
+    return [f.rule for f in audit_local.analyze(text).findings]
+
+
+class TestParse:
+    """Test logical-line parsing."""
+
+    def test_continuation_lines_are_joined(self):
+        """Verify backslash continuations form one logical line."""
+        lines = audit_local.parse("export A=1 \\\n  B=2\necho done\n")
+        assert (lines[0].start, lines[0].end) == (1, 2)
+        assert lines[1].start == 3
+
+    def test_loop_body_is_marked(self):
+        """Verify lines between do and done are inside a loop."""
+        lines = audit_local.parse("for d in a b; do\n  echo $d\ndone\necho after\n")
+        assert [l.in_loop for l in lines[:4]] == [True, True, True, False]
+
+    def test_quoted_keywords_do_not_open_loops(self):
+        """Verify 'do' inside a string is not treated as a loop keyword."""
+        lines = audit_local.parse('echo "things to do"\nexport PATH="$x:$PATH"\n')
+        assert not lines[1].in_loop
+
+
+class TestAnalyze:
+    """Test detection and cost estimation of slow constructs."""
+
+    def test_cacheable_eval(self):
+        """Verify init evals are cached and keep surrounding guards."""
+        text = 'command -v pyenv >/dev/null && eval "$(pyenv init -)"\n'
+        report = audit_local.analyze(text)
+        assert rules(text) == ["cached-eval"]
+        assert report.findings[0].cost_ms > 0
+        assert audit_local.rewrite(text, report) == \
+            "command -v pyenv >/dev/null && _zshrc_cached_eval pyenv init -\n"
+
+    def test_per_shell_eval_is_not_cached(self):
+        """Verify evals with per-shell output (ssh-agent) are left alone."""
+        assert rules('eval "$(ssh-agent -s)"\n') == []
+
+    def test_process_substitution_source(self):
+        """Verify `source <(kubectl completion zsh)` is cached."""
+        text = "source <(kubectl completion zsh)\n"
+        report = audit_local.analyze(text)
+        assert audit_local.rewrite(text, report) == "_zshrc_cached_eval kubectl completion zsh\n"
+
+    def test_brew_prefix(self):
+        """Verify $(brew --prefix [formula]) uses $HOMEBREW_PREFIX."""
+        text = 'export A="$(brew --prefix)/bin"\nexport B="$(brew --prefix openssl@3)"\n'
+        new = audit_local.rewrite(text, audit_local.analyze(text))
+        assert 'export A="${HOMEBREW_PREFIX:-$(brew --prefix)}/bin"' in new
+        assert 'export B="${HOMEBREW_PREFIX:-$(brew --prefix)}/opt/openssl@3"' in new
+
+    def test_brew_prefix_twice_on_one_line(self):
+        """Verify each occurrence on a line is rewritten exactly once."""
+        text = 'export A="$(brew --prefix)/a:$(brew --prefix gnu-sed)/b:$(brew --prefix)/c"\n'
+        new = audit_local.rewrite(text, audit_local.analyze(text))
+        assert new == ('export A="${HOMEBREW_PREFIX:-$(brew --prefix)}/a:'
+                       '${HOMEBREW_PREFIX:-$(brew --prefix)}/opt/gnu-sed/b:'
+                       '${HOMEBREW_PREFIX:-$(brew --prefix)}/c"\n')
+
+    def test_rewrite_is_idempotent(self):
+        """Verify rewritten output has nothing left to rewrite."""
+        text = ('export A="$(brew --prefix)/a:$(brew --prefix)/b"\n'
+                'eval "$(pyenv init -)"; eval "$(zoxide init zsh)"\n')
+        once = audit_local.rewrite(text, audit_local.analyze(text))
+        assert rules(once) == []
+        assert audit_local.rewrite(once, audit_local.analyze(once)) == once
+
+    def test_duplicate_compinit(self):
+        """Verify compinit is neutralized without emptying an if body."""
+        text = "if true; then\n  autoload -Uz compinit && compinit\nfi\n"
+        new = audit_local.rewrite(text, audit_local.analyze(text))
+        assert "\n  : # already run by Oh My Zsh" in new
+        assert new.endswith("fi\n")
+
+    def test_two_line_compinit_is_one_finding(self):
+        """Verify `autoload -Uz compinit` on its own line is not counted."""
+        text = "autoload -Uz compinit\ncompinit\n"
+        report = audit_local.analyze(text)
+        assert [(f.rule, f.start) for f in report.findings] == [("compinit", 2)]
+        assert report.findings[0].fixable
+        assert rules(audit_local.rewrite(text, report)) == []
+
+    def test_compinit_after_fpath_is_manual(self):
+        """Verify compinit is only reported when the file extends fpath first."""
+        report = audit_local.analyze("fpath=(~/.zfunc $fpath)\ncompinit\n")
+        assert [f.rule for f in report.findings] == ["compinit"]
+        assert not report.findings[0].fixable
+
+    def test_second_nvm_load(self):
+        """Verify a guarded nvm.sh load is detected."""
+        text = '[ -f "$NVM_DIR/nvm.sh" ] && \\. "$NVM_DIR/nvm.sh"\n'
+        assert rules(text) == ["nvm-reload"]
+
+    def test_nvm_load_is_guarded(self):
+        """Verify nvm loads only run when ~/.zshrc has not loaded nvm."""
+        text = '[ -s "$NVM_DIR/nvm.sh" ] && \\. "$NVM_DIR/nvm.sh"  # This loads nvm\n'
+        new = audit_local.rewrite(text, audit_local.analyze(text))
+        assert new == ('if (( ! $+functions[nvm] )); then\n'
+                       '  [ -s "$NVM_DIR/nvm.sh" ] && \\. "$NVM_DIR/nvm.sh"  # This loads nvm\n'
+                       'fi\n')
+        assert rules(new) == []
+
+    def test_homebrew_nvm_load(self):
+        """Verify the Homebrew nvm forms are detected and keep loading."""
+        text = ('source $(brew --prefix nvm)/nvm.sh\n'
+                '[ -s "/opt/homebrew/opt/nvm/etc/bash_completion.d/nvm" ] && '
+                '\\. "/opt/homebrew/opt/nvm/etc/bash_completion.d/nvm"\n')
+        assert rules(text) == ["nvm-reload", "nvm-reload"]
+        new = audit_local.rewrite(text, audit_local.analyze(text))
+        assert "if (( ! $+functions[nvm] )); then\n" \
+            "  source ${HOMEBREW_PREFIX:-$(brew --prefix)}/opt/nvm/nvm.sh\nfi\n" in new
+        assert "if (( ! $+functions[__nvm] )); then" in new
+        assert rules(new) == []
+
+    def test_path_prepend_in_loop_is_reported(self):
+        """Verify PATH prepends inside loops are reported but not rewritten."""
+        text = 'for d in ~/bin ~/tools/*/bin; do\n  export PATH="$d:$PATH"\ndone\n'
+        report = audit_local.analyze(text)
+        assert [f.rule for f in report.findings] == ["path-loop"]
+        assert not report.findings[0].fixable
+
+    def test_path_prepend_outside_loop_is_fine(self):
+        """Verify a single PATH prepend is not flagged."""
+        assert rules('export PATH="$HOME/bin:$PATH"\n') == []
+
+    def test_conda_block_becomes_lazy(self):
+        """Verify the conda init block is replaced by a lazy conda function."""
+        text = "export A=1\n" + CONDA_BLOCK + "export B=2\n"
+        report = audit_local.analyze(text)
+        assert [f.rule for f in report.findings] == ["conda-init"]
+        new = audit_local.rewrite(text, report)
+        assert "conda() {" in new
+        assert "'/opt/miniconda3/bin/conda' 'shell.zsh' 'hook'" in new
+        assert "__conda_setup" not in new
+        assert 'export PATH="/opt/miniconda3/condabin:$PATH"' in new
+        assert "/opt/miniconda3/bin:$PATH" not in new, \
+            "base's bin is only on PATH when the hook activates base"
+        assert new.startswith("export A=1\n") and new.endswith("export B=2\n")
+
+    def test_conda_markers_are_kept(self):
+        """Verify `conda init` can find the block again and it isn't re-reported."""
+        new = audit_local.rewrite(CONDA_BLOCK, audit_local.analyze(CONDA_BLOCK))
+        assert audit_local.CONDA_BEGIN in new and audit_local.CONDA_END in new
+        assert rules(new) == []
+
+    def test_comments_are_ignored(self):
+        """Verify commented-out constructs are not reported."""
+        assert rules('# eval "$(pyenv init -)"\n# compinit\n') == []
+
+
+class TestCommandLine:
+    """Test the standalone command."""
+
+    @pytest.fixture
+    def local_file(self, tmp_path):
+        """Write a migrated ~/.zshrc.local with a slow construct."""
+        path = tmp_path / ".zshrc.local"
+        path.write_text('export EDITOR=vim\neval "$(pyenv init -)"\n')
+        return path
+
+    def run(self, *args):
+        return subprocess.run([sys.executable, str(AUDIT_SCRIPT), *map(str, args)],
+                              capture_output=True, text=True)
+
+    def test_diff_is_a_dry_run(self, local_file):
+        """Verify --diff prints a diff and leaves the file unchanged."""
+        before = local_file.read_text()
+        result = self.run("--diff", local_file)
+        assert result.returncode == 0
+        assert "+_zshrc_cached_eval pyenv init -" in result.stdout
+        assert local_file.read_text() == before
+
+    def test_write_applies_and_backs_up(self, local_file):
+        """Verify --write rewrites the file and keeps a backup."""
+        before = local_file.read_text()
+        result = self.run("--write", local_file)
+        assert result.returncode == 0
+        assert "_zshrc_cached_eval pyenv init -" in local_file.read_text()
+        backup = local_file.with_name(".zshrc.local.pre-audit-backup")
+        assert backup.read_text() == before
+
+    def test_missing_file(self, tmp_path):
+        """Verify a missing file is an error."""
+        assert self.run(tmp_path / "nope").returncode == 1
+
+
+class TestIntegration:
+    """Test wiring into install.sh and zshrc."""
+
+    def test_install_audits_migrated_config(self, repo_dir):
+        """Verify install.sh runs the analyzer in dry-run mode after migration."""
+        content = (repo_dir / "scripts" / "install.sh").read_text()
+        assert "audit_user_config()" in content
+        assert 'audit_local.py" --diff' in content
+
+    def test_zshrc_provides_rewrite_helpers(self, repo_dir):
+        """Verify zshrc defines what the rewrites rely on."""
+        content = (repo_dir / "zshrc").read_text()
+        assert "_zshrc_cached_eval() {" in content
+        assert "export HOMEBREW_PREFIX=" in content
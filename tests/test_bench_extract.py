@@ -0,0 +1,83 @@
+"""
+Tests for scripts/bench_extract.py (px vs Oh My Zsh extract benchmark).
+"""
+import importlib.util
+import shutil
+import subprocess
+import tarfile
+from pathlib import Path
+import pytest
+
+BENCH_SCRIPT = Path(__file__).parent.parent / "scripts" / "bench_extract.py"
+
+_spec = importlib.util.spec_from_file_location("bench_extract", BENCH_SCRIPT)
+bench_extract = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(bench_extract)
+
+
+class TestArchiveGeneration:
+    """Test generated benchmark archives."""
+
+    @pytest.fixture
+    def archives(self, tmp_path):
+        """Generate small archives in a temporary directory."""
+        return bench_extract.make_archives(tmp_path, 1)
+
+    def test_one_archive_per_format(self, archives):
+        """Verify gzip, bzip2 and xz archives are always generated."""
+        names = {a.name for a in archives}
+        assert {"bench-gz.tar.gz", "bench-bz2.tar.bz2", "bench-xz.tar.xz"} <= names
+
+    def test_archives_have_distinct_stems(self, archives):
+        """Verify concurrent extraction never shares an output directory."""
+        stems = [a.name.split(".")[0] for a in archives]
+        assert len(set(stems)) == len(stems)
+
+    def test_archives_hold_the_payload(self, archives):
+        """Verify each tar archive contains the full payload."""
+        for archive in archives:
+            if archive.name.endswith(".zst"):
+                continue
+            with tarfile.open(archive) as tar:
+                size = sum(m.size for m in tar.getmembers() if m.isfile())
+            assert size == bench_extract.CHUNK, f"{archive.name} payload size"
+
+    def test_payload_is_removed(self, tmp_path, archives):
+        """Verify only archives are left behind."""
+        assert not (tmp_path / "payload").exists()
+
+
+class TestCommands:
+    """Test the commands being compared."""
+
+    def test_px_sources_repo_zshrc(self, tmp_path):
+        """Verify px runs from the repo zshrc with the requested job count."""
+        cmd = bench_extract.px_command([tmp_path / "a.tar.gz"], 4)
+        assert str(bench_extract.ZSHRC) in cmd[2]
+        assert "px -j 4" in cmd[2]
+
+    @pytest.mark.skipif(not shutil.which("zsh"), reason="zsh not installed")
+    def test_px_command_extracts(self, tmp_path):
+        """Verify px_command really runs px with the benchmark's environment."""
+        archive = bench_extract.make_archives(tmp_path, 1)[0]
+        out = tmp_path / "out"
+        out.mkdir()
+        result = subprocess.run(bench_extract.px_command([archive], 1), cwd=out,
+                                env=bench_extract.bench_env(tmp_path),
+                                capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        extracted = list(out.glob("*/payload/*.txt"))
+        assert sum(p.stat().st_size for p in extracted) == bench_extract.CHUNK
+
+    def test_plugin_skipped_without_oh_my_zsh(self, tmp_path):
+        """Verify the plugin column is skipped when Oh My Zsh is missing."""
+        assert bench_extract.plugin_command(tmp_path, [tmp_path / "a.tar.gz"]) is None
+
+    def test_format_rows(self):
+        """Verify speedup is reported only when the plugin ran."""
+        out = bench_extract.format_rows([
+            {"archive": "bench-gz.tar.gz", "mb": 3.0, "plugin": 3.0, "px": 1.0},
+            {"archive": "bench-xz.tar.xz", "mb": 1.0, "plugin": None, "px": 0.5},
+        ])
+        assert "3.00x" in out
+        assert "n/a" in out
@@ -106,3 +106,219 @@ class TestZshrcStructure:
                         if line.strip().startswith('#') and len(line.strip()) > 1]
         assert len(comment_lines) > 5, "zshrc should have helpful comments"
 
+
+
+class TestZshrcProfiles:
+    """Test full / lean / minimal startup profile selection."""
+    
+    @pytest.fixture
+    def zshrc_content(self, repo_dir):
+        """Load zshrc file content."""
+        zshrc = repo_dir / "zshrc"
+        return zshrc.read_text()
+    
+    def test_profile_override_variable(self, zshrc_content):
+        """Verify ZSHRC_PROFILE can force a profile."""
+        assert '"$ZSHRC_PROFILE" == (full|lean|minimal)' in zshrc_content, \
+            "zshrc should honor ZSHRC_PROFILE=full|lean|minimal"
+    
+    def test_profile_selected_before_instant_prompt(self, zshrc_content):
+        """Verify the profile is chosen before anything expensive loads."""
+        assert zshrc_content.index("ZSHRC_ACTIVE_PROFILE=") < \
+            zshrc_content.index("p10k-instant-prompt"), \
+            "Profile selection should come before the instant prompt"
+    
+    def test_profile_detection_inputs(self, zshrc_content):
+        """Verify detection looks at TERM, TTY, SSH and `zsh -c` shells."""
+        for marker in ['"$TERM" == dumb', "! -t 0", "! -t 1",
+                       "ZSH_EXECUTION_STRING", "VSCODE_RESOLVING_ENVIRONMENT"]:
+            assert marker in zshrc_content, f"Profile detection should check {marker}"
+    
+    def test_ssh_terminal_with_tty_stays_full(self, zshrc_content):
+        """Verify SSH_CONNECTION alone (Remote-SSH, tmux) doesn't force lean."""
+        start = zshrc_content.index('if [[ "$ZSHRC_PROFILE" == (full|lean|minimal) ]]')
+        detection = zshrc_content[start:zshrc_content.index("\nfi\n", start)]
+        code = [line for line in detection.split('\n') if not line.lstrip().startswith('#')]
+        assert not any("SSH_CONNECTION" in line for line in code), \
+            "A terminal with a TTY should get the full profile even over SSH"
+    
+    def test_heavy_components_only_in_full_profile(self, zshrc_content):
+        """Verify Oh My Zsh, p10k, nvm.sh and thefuck are gated on full."""
+        lines = zshrc_content.split('\n')
+        for marker in ["source $ZSH/oh-my-zsh.sh", "source ~/.p10k.zsh",
+                       '"$NVM_DIR/nvm.sh"', "thefuck --alias"]:
+            idx = next(i for i, line in enumerate(lines) if marker in line)
+            gate = next(line for line in reversed(lines[:idx + 1])
+                        if "ZSHRC_ACTIVE_PROFILE" in line)
+            assert '== full' in gate, f"{marker} should only load in the full profile"
+    
+    def test_local_overrides_sourced_unconditionally(self, zshrc_content):
+        """Verify ~/.zshrc.local is sourced at top level in every profile."""
+        assert re.search(r'^\[ -f ~/\.zshrc\.local \] && source ~/\.zshrc\.local$',
+                         zshrc_content, re.MULTILINE), \
+            "~/.zshrc.local should be sourced outside any profile gate"
+    
+    def test_compdef_guarded(self, zshrc_content):
+        """Verify compdef is not called when compinit never ran."""
+        assert "(( $+functions[compdef] )) && compdef _mygit mygit" in zshrc_content, \
+            "compdef should be guarded for lean shells without Oh My Zsh"
+
+
+class TestZshrcRuntimeSwitching:
+    """Test the per-directory Node / Python switcher."""
+    
+    @pytest.fixture
+    def zshrc_content(self, repo_dir):
+        """Load zshrc file content."""
+        zshrc = repo_dir / "zshrc"
+        return zshrc.read_text()
+    
+    def test_registered_as_chpwd_hook(self, zshrc_content):
+        """Verify the switcher runs on every directory change."""
+        assert "add-zsh-hook chpwd _zshrc_rt_chpwd" in zshrc_content, \
+            "Runtime switcher should be a chpwd hook"
+    
+    def test_recognizes_version_files(self, zshrc_content):
+        """Verify all supported markers are looked up."""
+        for marker in [".nvmrc", ".node-version", ".python-version", ".venv"]:
+            assert marker in zshrc_content, f"Switcher should recognize {marker}"
+    
+    def test_caches_against_mtime(self, zshrc_content):
+        """Verify lookups are cached and invalidated by mtime via zstat."""
+        assert "zmodload -F zsh/stat b:zstat" in zshrc_content
+        assert "+mtime" in zshrc_content
+    
+    def test_does_not_spawn_version_managers(self, zshrc_content):
+        """Verify switching edits PATH instead of running nvm or pyenv."""
+        start = zshrc_content.index("_zshrc_rt_markers() {")
+        end = zshrc_content.index("add-zsh-hook chpwd")
+        body = zshrc_content[start:end]
+        for line in body.split('\n'):
+            assert not re.match(r'\s*(command\s+)?(nvm|pyenv)\s', line), \
+                f"Switcher should not call nvm or pyenv: {line.strip()}"
+        assert "$(nvm" not in body and "$(pyenv" not in body
+    
+    def test_swap_only_removes_its_own_entry(self, zshrc_content):
+        """Verify the swap never strips PATH entries the hook did not insert."""
+        start = zshrc_content.index("_zshrc_rt_swap() {")
+        body = zshrc_content[start:zshrc_content.index("\n}\n", start)]
+        assert ":#" not in body, "Swap should not filter out every equal entry"
+        assert "path[(ie)$new]" in body, "Swap should not prepend an entry already on PATH"
+        assert "path[$idx]=()" in body
+    
+    def test_pyenv_virtualenv_symlinks_resolve(self, zshrc_content):
+        """Verify pyenv versions are globbed through symlinks (pyenv-virtualenv)."""
+        assert "/versions/${spec}(|.*)(N-/nOn)" in zshrc_content
+    
+    def test_resolve_cache_sees_new_installs(self, zshrc_content):
+        """Verify a version installed after the first cd is picked up."""
+        start = zshrc_content.index("_zshrc_rt_resolve() {")
+        body = zshrc_content[start:zshrc_content.index("\n}\n", start)]
+        assert 'root="$NVM_DIR/versions/node"' in body
+        assert 'root="${PYENV_ROOT:-$HOME/.pyenv}/versions"' in body
+        assert 'zstat -A st +mtime -- "$root"' in body
+    
+    def test_can_be_disabled(self, zshrc_content):
+        """Verify ZSHRC_AUTO_RUNTIME=false turns the switcher off."""
+        assert '"$ZSHRC_AUTO_RUNTIME" != false' in zshrc_content
+
+
+class TestZshrcPathAndRehash:
+    """Test PATH de-duplication and the mtime-driven rehash policy."""
+    
+    @pytest.fixture
+    def zshrc_content(self, repo_dir):
+        """Load zshrc file content."""
+        zshrc = repo_dir / "zshrc"
+        return zshrc.read_text()
+    
+    def test_path_deduplicated_before_prepends(self, zshrc_content):
+        """Verify PATH is unique before Homebrew and ~/.local/bin are prepended."""
+        assert "typeset -U path PATH" in zshrc_content
+        assert zshrc_content.index("typeset -U path PATH") < \
+            zshrc_content.index('export PATH="/opt/homebrew/bin:$PATH"')
+    
+    def test_rehash_driven_by_precmd_hook(self, zshrc_content):
+        """Verify rehash runs from a precmd hook that compares mtimes."""
+        assert "add-zsh-hook precmd _zshrc_rehash_precmd" in zshrc_content
+        start = zshrc_content.index("_zshrc_rehash_precmd() {")
+        body = zshrc_content[start:zshrc_content.index("\n}\n", start)]
+        assert "+mtime" in body and "rehash" in body
+    
+    def test_rehash_on_every_completion_only_as_fallback(self, zshrc_content):
+        """Verify `rehash true` is only used when zstat is unavailable."""
+        lines = zshrc_content.split('\n')
+        idx = next(i for i, line in enumerate(lines)
+                   if "zstyle ':completion:*' rehash true" in line and
+                   not line.strip().startswith('#'))
+        assert lines[idx - 1].strip() == "else", \
+            "rehash true should only be the fallback without zstat"
+
+
+class TestZshrcParallelExtract:
+    """Test the px streaming / parallel extraction function."""
+    
+    @pytest.fixture
+    def px_body(self, repo_dir):
+        """Load the px and _px_one function bodies."""
+        content = (repo_dir / "zshrc").read_text()
+        start = content.index("  px() {")
+        end = content.index("\n  }\n", content.index("  _px_one() {"))
+        return content[start:end]
+    
+    def test_prefers_multithreaded_decompressors(self, px_body):
+        """Verify parallel decompressors are picked before the serial ones."""
+        assert "_px_pick pigz gzip" in px_body
+        assert "_px_pick lbzip2 pbzip2 bzip2" in px_body
+        assert "xz -T0 -dc" in px_body
+        assert "zstd -T0 -dc" in px_body
+    
+    def test_streams_into_tar_without_temp_files(self, px_body):
+        """Verify decompression is piped straight into tar."""
+        assert '"${dec[@]}" | tar -xf - -C "$dest"' in px_body
+        assert "mktemp" not in px_body
+    
+    def test_pipeline_failures_are_reported(self, px_body):
+        """Verify a failing decompressor fails the whole extraction."""
+        assert "pipe_fail" in px_body
+    
+    def test_reports_progress_and_throughput(self, px_body):
+        """Verify pv is used when present and MB/s is printed."""
+        assert "pv -N" in px_body
+        assert "MB/s" in px_body
+    
+    def test_extracts_concurrently(self, px_body):
+        """Verify several archives run as a bounded pool of background jobs."""
+        assert "PX_JOBS" in px_body
+        assert "_px_one \"$archive\" multi \"$force\" &" in px_body
+        assert "wait $pids[1]" in px_body
+    
+    def test_interrupt_stops_workers(self, px_body):
+        """Verify Ctrl-C kills and reaps background workers instead of orphaning them."""
+        assert "trap '_px_kill $pids; return 130' INT TERM" in px_body
+        assert "local_traps" in px_body
+    
+    def test_does_not_overwrite_without_force(self, px_body):
+        """Verify px notes.txt.gz refuses to replace an existing ./notes.txt."""
+        assert '[[ -e "$dest" && -z "$force" ]]' in px_body
+        assert "-f) force=1" in px_body
+    
+    def test_refuses_shared_destination(self, px_body):
+        """Verify concurrent jobs never extract into the same directory."""
+        assert "both extract into ./$REPLY" in px_body
+    
+    def test_destination_suffix_is_case_insensitive(self, px_body):
+        """Verify FOO.TAR.GZ extracts into ./FOO, not onto the archive itself."""
+        assert '${name%.(#i)(tar|tar.*|tgz|tbz|tbz2|txz|tzst)}' in px_body
+        assert "extended_glob" in px_body
+        assert '_px_dest "$archive"' in px_body
+
+
+class TestZshrcLeanAliases:
+    """Test that aliases defined in the lean profile don't need Oh My Zsh."""
+    
+    def test_gpush_does_not_need_oh_my_zsh(self, repo_dir):
+        """Verify gpush doesn't call Oh My Zsh's git_current_branch."""
+        content = (repo_dir / "zshrc").read_text()
+        assert "alias gpush='git push origin $(git branch --show-current)'" in content
+        assert "$(git_current_branch)" not in content